@@ -16,22 +16,81 @@ from rich import print
 from rich.console import Console
 from rich.panel import Panel
 from rich.prompt import Prompt, Confirm
-from rich.progress import track
+from rich.progress import Progress, TextColumn, track
 from rich.table import Table
 import meraki
-from meraki.exceptions import APIError
+import meraki.aio
+from meraki.exceptions import APIError, AsyncAPIError
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import argparse
+import asyncio
+import functools
+import hashlib
+import json
 import os
+import re
 import sys
+import time
+from collections import defaultdict, deque
 from csv import DictReader
+from pathlib import Path
+from typing import Iterable, Iterator, TextIO
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Load environment variables
 load_dotenv()
 
 API_KEY = os.getenv("MERAKI_DASHBOARD_API_KEY")
+ORG_ID = os.getenv("MERAKI_ORG_ID")
+HTTPS_PROXY = os.getenv("HTTPS_PROXY", "")
 
 console = Console()
 
+# Meraki allows ~5 concurrent API requests per org
+MAX_WORKERS = 5
+
+# Meraki action batch limits
+ACTION_BATCH_SIZE = 100
+MAX_ACTION_BATCHES = 5
+ACTION_BATCH_POLL_SECONDS = 1
+ACTION_BATCH_TIMEOUT_SECONDS = 300
+BONJOUR_RESOURCE = "/networks/{}/wireless/ssids/{}/bonjourForwarding"
+
+# Shared Meraki SDK client options. 429s already honour Retry-After, so
+# keep the fallback cooldowns short instead of the SDK's fixed defaults
+DASHBOARD_OPTIONS = {
+    "suppress_logging": True,
+    "wait_on_rate_limit": True,
+    "nginx_429_retry_wait_time": 1,
+    "action_batch_retry_wait_time": 1,
+    "maximum_retries": 5,
+    "requests_proxy": HTTPS_PROXY,
+}
+
+# On-disk cache for org inventory lookups
+CACHE_DIR = Path.home() / ".cache" / "bonjour_updater"
+CACHE_TTL = 15 * 60
+CACHE_MAX_FILES = 20
+# Bump when the shape of cached data changes
+CACHE_VERSION = 3
+
+# Hand CSV parsing off to pandas (if installed) for files larger than this
+LARGE_CSV_BYTES = 5_000_000
+CSV_CHUNK_ROWS = 10_000
+PROGRESS_STEP = 256
+MAX_BAD_ROWS = 500
+
 BONJOUR_SERVICES = [
     "All Services",
     "AirPlay",
@@ -45,12 +104,139 @@ BONJOUR_SERVICES = [
     "Scanners",
     "SSH",
 ]
+# Lowercase service name -> canonical Meraki service name
+_CANON = {s.lower(): s for s in BONJOUR_SERVICES}
+# Matches a comma separated list of known services, e.g. "AFP, ftp,SSH"
+_SVC_NAME = "|".join(re.escape(s) for s in BONJOUR_SERVICES)
+_SVC_RE = re.compile(
+    rf"\s*(?:{_SVC_NAME})\s*(?:,\s*(?:{_SVC_NAME})\s*)*", re.IGNORECASE
+)
+
+# CSV validation error labels
+BAD_NETWORK = "Network Name Mismatch"
+BAD_SSID = "SSID Name Mismatch"
+BAD_VLAN = "Bad VLAN ID"
+BAD_SERVICES = "Bad Services"
+
+
+def cachePath(org_id: str, name: str) -> Path:
+    """
+    Build cache file path for a given org / lookup
+    """
+    key = f"{CACHE_VERSION}:{org_id}:{name}"
+    key = hashlib.sha256(key.encode()).hexdigest()[:16]
+    return CACHE_DIR / f"{key}.json"
+
+
+def readCache(org_id: str, name: str):
+    """
+    Return cached data if present & not expired, else None
+    """
+    path = cachePath(org_id, name)
+    try:
+        with open(path, "r") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() - entry["timestamp"] > CACHE_TTL:
+        return None
+    # Mark as recently used for LRU eviction
+    path.touch()
+    return entry["data"]
+
+
+def writeCache(org_id: str, name: str, data) -> None:
+    """
+    Store data in cache, evicting least recently used entries
+    """
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(cachePath(org_id, name), "w") as f:
+            json.dump({"timestamp": time.time(), "data": data}, f)
+        entries = sorted(CACHE_DIR.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for stale in entries[:-CACHE_MAX_FILES]:
+            stale.unlink()
+    except OSError:
+        pass
+
+
+def cached(func):
+    """
+    Cache results of an org-level lookup on disk, keyed by org ID.
+    Wrapped function must take (dashboard, org_id, ...) - pass
+    refresh=True to bypass the cache.
+    """
+    name = func.__name__
+
+    if asyncio.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def wrapper(dashboard, org_id: str, *args, refresh: bool = False):
+            data = None if refresh else readCache(org_id, name)
+            if data is None:
+                data = await func(dashboard, org_id, *args)
+                writeCache(org_id, name, data)
+            else:
+                print(f"Using cached results for {name}.")
+            return data
+
+    else:
+
+        @functools.wraps(func)
+        def wrapper(dashboard, org_id: str, *args, refresh: bool = False):
+            data = None if refresh else readCache(org_id, name)
+            if data is None:
+                data = func(dashboard, org_id, *args)
+                writeCache(org_id, name, data)
+            else:
+                print(f"Using cached results for {name}.")
+            return data
+
+    return wrapper
+
+
+def configureSession(dashboard: meraki.DashboardAPI) -> None:
+    """
+    Reuse pooled connections on the SDK's HTTP session
+    """
+    # Status code retries (429 etc) are left to the SDK, only retry connects
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=10,
+        max_retries=Retry(total=3, connect=3, backoff_factor=0.5),
+    )
+    dashboard._session._req_session.mount("https://", adapter)
+
+
+def configureAsyncSession(aio_dashboard: meraki.aio.AsyncDashboardAPI) -> None:
+    """
+    Serialize request bodies with orjson, if installed
+    """
+    if orjson is not None:
+        session = aio_dashboard._session._req_session
+        # aiohttp expects a str from its JSON serializer, orjson returns bytes
+        session._json_serialize = lambda obj: orjson.dumps(obj).decode()
+
+
+def errorMessage(e: AsyncAPIError) -> str:
+    """
+    Pull the first error out of an async Meraki API exception. The message
+    is either the parsed JSON response or a plain string
+    """
+    if isinstance(e.message, dict) and e.message.get("errors"):
+        return e.message["errors"][0]
+    return str(e.message)
 
 
 def getOrgs(dashboard: meraki.DashboardAPI) -> str:
     """
     Get Meraki organizations and prompt user to select one
     """
+    # Skip org lookup if already provided
+    if ORG_ID:
+        print(f"Found org ID as environment variable. Working with Org: {ORG_ID}")
+        return ORG_ID
+
     with console.status("Connecting to Meraki...."):
         try:
             orgs = dashboard.organizations.getOrganizations()
@@ -81,120 +267,246 @@ def getOrgs(dashboard: meraki.DashboardAPI) -> str:
             return org["id"]
 
 
+@cached
 def getNetworks(dashboard: meraki.DashboardAPI, org_id: str) -> dict:
     """
     Collect existing Meraki network names / IDs
     """
     print("Collecting networks...")
-    networks = dashboard.organizations.getOrganizationNetworks(org_id)
-    print(f"Found {len(networks)} networks.")
+    networks = dashboard.organizations.getOrganizationNetworks(
+        org_id, total_pages="all", perPage=1000
+    )
+    # Skip any non-wireless networks. The pinned SDK does not support
+    # filtering by productTypes server-side
+    networks = [n for n in networks if "wireless" in n["productTypes"]]
+    print(f"Found {len(networks)} wireless networks.")
     return networks
 
 
-def getNetworkSSID(dashboard: meraki.DashboardAPI, networks: dict) -> dict:
+@cached
+async def getNetworkSSID(
+    aio_dashboard: meraki.aio.AsyncDashboardAPI, org_id: str, networks: dict
+) -> dict:
     """
     Collect SSIDs for each network
     """
-    ssid_map = {}
+    net_id_by_name = {network["name"]: network["id"] for network in networks}
+    ssid_num_by_name_by_netid = {network["id"]: {} for network in networks}
     print("Collecting SSIDs for each network...")
-    for network in track(networks, description="Working..."):
-        # Skip any non-wireless networks
-        if not "wireless" in network["productTypes"]:
-            continue
-        ssids = dashboard.wireless.getNetworkWirelessSsids(network["id"])
-        ssid_map[network["name"]] = {}
-        ssid_map[network["name"]]["id"] = network["id"]
-        ssid_map[network["name"]]["ssids"] = {
+
+    async def fetch(network_id: str) -> tuple:
+        ssids = await aio_dashboard.wireless.getNetworkWirelessSsids(network_id)
+        return network_id, ssids
+
+    tasks = [fetch(network_id) for network_id in ssid_num_by_name_by_netid]
+    for task in track(
+        asyncio.as_completed(tasks), total=len(tasks), description="Working..."
+    ):
+        network_id, ssids = await task
+        ssid_num_by_name_by_netid[network_id] = {
             ssid["name"]: ssid["number"] for ssid in ssids
         }
 
     print("[green]Done!")
-    return ssid_map
+    return {
+        "net_id_by_name": net_id_by_name,
+        "ssid_num_by_name_by_netid": ssid_num_by_name_by_netid,
+    }
 
 
-def openCSV() -> dict:
+def indexSSIDs(ssids: dict) -> dict:
     """
-    Open CSV File & read contents
+    Add reverse lookups (network ID -> name, SSID number -> name) to
+    the output of getNetworkSSID
+    """
+    ssids["net_name_by_id"] = {
+        net_id: name for name, net_id in ssids["net_id_by_name"].items()
+    }
+    ssids["ssid_name_by_num_by_netid"] = {
+        net_id: {num: name for name, num in nums.items()}
+        for net_id, nums in ssids["ssid_num_by_name_by_netid"].items()
+    }
+    return ssids
+
+
+def openCSV() -> Iterator[dict]:
+    """
+    Open CSV File & stream contents
     """
     while True:
         file = input("Enter the CSV file name: ")
         try:
-            with open(file, "r") as f:
-                print("Reading CSV...")
-                csv = DictReader(f, skipinitialspace=True)
-                csv_data = [row for row in csv]
-                print("[green]Done!")
-                return csv_data
+            f = open(file, "r")
         except FileNotFoundError:
             print(f"[red]Cannot locate file: {file}")
             print()
+            continue
+        print("Reading CSV...")
+        return readCSV(f)
 
 
-def processCSV(csv: dict, ssids: dict) -> None:
+def readCSV(f: TextIO) -> Iterator:
     """
-    Validate CSV Input
+    Yield CSV rows one at a time, closing the file when exhausted.
+    Large files are yielded as pandas DataFrame chunks instead.
     """
-    print("Checking CSV file...")
-    print(f"{len(csv)} entries to validate.")
-    bad_network = []
-    bad_ssid = []
-    bad_vlan = []
-    bad_services = []
-    good = 0
-    good_entries = {}
-
-    for line in track(csv, "Working..."):
-        # Check each line to make sure network / SSID match what Meraki has
-        try:
-            target_network = ssids[line["Network Name"]]
-        except KeyError:
-            bad_network.append(line)
-            continue
+    with f:
+        if pd is not None and os.fstat(f.fileno()).st_size > LARGE_CSV_BYTES:
+            yield from pd.read_csv(
+                f,
+                skipinitialspace=True,
+                dtype=str,
+                keep_default_na=False,
+                chunksize=CSV_CHUNK_ROWS,
+            )
+        else:
+            yield from DictReader(f, skipinitialspace=True)
 
-        try:
-            target_ssidnum = target_network["ssids"][line["SSID Name"]]
-        except KeyError:
-            bad_ssid.append(line)
-            continue
 
-        try:
-            vlan = int(line["VLAN"])
-            if not vlan > 1 or not vlan < 4096:
-                raise ValueError
-        except ValueError:
-            bad_vlan.append(line)
-            continue
-
-        services = [s.strip() for s in line["Services"].split(",")]
-        ok = True
-        for service in services:
-            if service.lower() not in [x.lower() for x in BONJOUR_SERVICES]:
-                bad_services.append(line)
-                ok = False
-                break
-        if not ok:
-            continue
+def validateRow(line: dict, net_ids: dict, ssid_nums: dict) -> tuple:
+    """
+    Check a single CSV row against Meraki networks / SSIDs.
+    Returns (error, line, None) or (None, line, (network_id, ssid, rule))
+    """
+    # Check each line to make sure network / SSID match what Meraki has
+    try:
+        network_id = net_ids[line["Network Name"]]
+    except KeyError:
+        return BAD_NETWORK, line, None
 
-        # If line passes:
-        good += 1
+    try:
+        target_ssidnum = ssid_nums[network_id][line["SSID Name"]]
+    except KeyError:
+        return BAD_SSID, line, None
+
+    vlan = line["VLAN"].strip()
+    if not vlan.isdecimal() or not 1 <= int(vlan) <= 4094:
+        return BAD_VLAN, line, None
+    vlan = int(vlan)
+
+    if not _SVC_RE.fullmatch(line["Services"]):
+        return BAD_SERVICES, line, None
+    # Normalize & de-duplicate services, preserving order
+    svc_lc = dict.fromkeys(s.strip().lower() for s in line["Services"].split(","))
+    services = [_CANON[s] for s in svc_lc]
+
+    rule = {
+        "description": line["Description"],
+        "vlanId": str(vlan),
+        "services": services,
+    }
+    return None, line, (network_id, target_ssidnum, rule)
+
+
+def validateFrame(df: "pd.DataFrame", net_ids: dict, ssid_nums: dict) -> list:
+    """
+    Vectorized equivalent of validateRow for a pandas DataFrame chunk
+    """
+    df = df.fillna("")
+    networks = df["Network Name"]
+    m_net = networks.isin(list(net_ids))
+    ssid_col = pd.Series(
+        [
+            ssid_nums[net_ids[network]].get(ssid) if network in net_ids else None
+            for network, ssid in zip(networks, df["SSID Name"])
+        ],
+        index=df.index,
+        dtype=object,
+    )
+    m_ssid = ssid_col.notna()
+    vlans = df["VLAN"].str.strip()
+    m_vlan = vlans.str.isdecimal() & pd.to_numeric(vlans, errors="coerce").between(
+        1, 4094
+    )
+    svc_lc = df["Services"].str.split(",").map(
+        lambda svcs: dict.fromkeys(s.strip().lower() for s in svcs)
+    )
+    m_svc = df["Services"].str.fullmatch(_SVC_RE)
+
+    results = []
+    checks = (
+        (BAD_NETWORK, ~m_net),
+        (BAD_SSID, m_net & ~m_ssid),
+        (BAD_VLAN, m_net & m_ssid & ~m_vlan),
+        (BAD_SERVICES, m_net & m_ssid & m_vlan & ~m_svc),
+    )
+    for error, mask in checks:
+        results.extend((error, line, None) for line in df[mask].to_dict("records"))
+
+    good = m_net & m_ssid & m_vlan & m_svc
+    for network, ssidnum, description, vlan, svcs in zip(
+        networks[good],
+        ssid_col[good],
+        df["Description"][good],
+        vlans[good],
+        svc_lc[good],
+    ):
+        rule = {
+            "description": description,
+            "vlanId": str(int(vlan)),
+            "services": [_CANON[s] for s in svcs],
+        }
+        results.append((None, None, (net_ids[network], ssidnum, rule)))
+    return results
 
-        # Restructure data for upload
-        if not target_network["id"] in good_entries.keys():
-            good_entries[target_network["id"]] = {}
-        if not target_ssidnum in good_entries[target_network["id"]].keys():
-            good_entries[target_network["id"]][target_ssidnum] = []
-        good_entries[target_network["id"]][target_ssidnum].append(
-            {
-                "description": line["Description"],
-                "vlanId": str(vlan),
-                "services": services,
-            }
-        )
 
-    if good == len(csv):
+def processCSV(csv: Iterable, ssids: dict) -> dict:
+    """
+    Validate CSV Input
+    """
+    print("Checking CSV file...")
+    total = 0
+    # Only keep the most recent bad rows per error type for display
+    bad = {
+        error: deque(maxlen=MAX_BAD_ROWS)
+        for error in (BAD_NETWORK, BAD_SSID, BAD_VLAN, BAD_SERVICES)
+    }
+    bad_totals = dict.fromkeys(bad, 0)
+    good = 0
+    good_entries = defaultdict(lambda: defaultdict(list))
+    net_ids = ssids["net_id_by_name"]
+    ssid_nums = ssids["ssid_num_by_name_by_netid"]
+
+    shown = 0
+    with Progress(
+        *Progress.get_default_columns(),
+        TextColumn("{task.completed} rows"),
+        console=console,
+        refresh_per_second=4,
+    ) as progress:
+        task = progress.add_task("Working...", total=None)
+        for item in csv:
+            if pd is not None and isinstance(item, pd.DataFrame):
+                total += len(item)
+                checked = validateFrame(item, net_ids, ssid_nums)
+            else:
+                total += 1
+                checked = [validateRow(item, net_ids, ssid_nums)]
+
+            for error, line, entry in checked:
+                if error:
+                    bad[error].append(line)
+                    bad_totals[error] += 1
+                    continue
+
+                # If line passes:
+                good += 1
+
+                # Restructure data for upload
+                network_id, ssidnum, rule = entry
+                good_entries[network_id][ssidnum].append(rule)
+
+            # Throttle progress updates, rendering is costly per row
+            if total - shown >= PROGRESS_STEP:
+                progress.update(task, completed=total)
+                shown = total
+        progress.update(task, completed=total)
+
+    print(f"{total} entries validated.")
+    if good == total:
         print("[green]All CSV rows processed. No issues found!")
     else:
-        print(f"\r\nIssues were found. Only {good} passed of {len(csv)}")
+        print(f"\r\nIssues were found. Only {good} passed of {total}")
         if Confirm.ask("Show errors?"):
             table = Table(
                 "Error",
@@ -204,44 +516,98 @@ def processCSV(csv: dict, ssids: dict) -> None:
                 "VLAN",
                 "Services",
                 expand=True,
-                show_lines=True
+                show_lines=True,
+                caption="\r\n".join(
+                    f"{error}: showing {len(bad[error])} of {count}"
+                    for error, count in bad_totals.items()
+                    if count > len(bad[error])
+                )
+                or None,
             )
-            for entry in bad_network:
-                table.add_row("Network Name Mismatch", *entry.values())
-            for entry in bad_ssid:
-                table.add_row("SSID Name Mismatch", *entry.values())
-            for entry in bad_vlan:
-                table.add_row("Bad VLAN ID", *entry.values())
-            for entry in bad_services:
-                table.add_row("Bad Services", *entry.values())
+            for error, entries in bad.items():
+                for entry in entries:
+                    table.add_row(error, *entry.values())
             print()
             print(table)
             print()
     return good_entries
 
 
-def updateBonjour(dashboard: meraki.DashboardAPI, data: dict) -> list:
+async def updateBonjour(
+    aio_dashboard: meraki.aio.AsyncDashboardAPI, org_id: str, data: dict
+) -> list:
     """
-    Update Bonjour settings across multiple networks
+    Update Bonjour settings across multiple networks via action batches
     """
-    print("Beginning update process...")
-    errors = []
-    for network_id in track(data):
-        for ssid_id in data[network_id]:
-            update_body = {"enabled": True, "rules": data[network_id][ssid_id]}
+    organizations = aio_dashboard.organizations
+    # Meraki limits an org to 5 concurrently running action batches
+    running = asyncio.Semaphore(MAX_ACTION_BATCHES)
+
+    def errorRow(error: str, network_id: str, ssid_id: int, update_body: dict):
+        return {
+            "error": error,
+            "network": network_id,
+            "ssid": ssid_id,
+            "payload": update_body,
+        }
+
+    async def updateOne(network_id: str, ssid_id: int, update_body: dict) -> dict:
+        try:
+            await aio_dashboard.wireless.updateNetworkWirelessSsidBonjourForwarding(
+                network_id, ssid_id, **update_body
+            )
+        except AsyncAPIError as e:
+            return errorRow(errorMessage(e), network_id, ssid_id, update_body)
+
+    async def runBatch(updates: list) -> list:
+        actions = [
+            {
+                "resource": BONJOUR_RESOURCE.format(network_id, ssid_id),
+                "operation": "update",
+                "body": update_body,
+            }
+            for network_id, ssid_id, update_body in updates
+        ]
+        async with running:
             try:
-                dashboard.wireless.updateNetworkWirelessSsidBonjourForwarding(
-                    network_id, ssid_id, **update_body
-                )
-            except APIError as e:
-                errors.append(
-                    {
-                        "error": e.message["errors"][0],
-                        "network": network_id,
-                        "ssid": ssid_id,
-                        "payload": update_body,
-                    }
+                batch = await organizations.createOrganizationActionBatch(
+                    org_id, actions, confirmed=True, synchronous=False
                 )
+                deadline = time.monotonic() + ACTION_BATCH_TIMEOUT_SECONDS
+                while not (batch["status"]["completed"] or batch["status"]["failed"]):
+                    if time.monotonic() > deadline:
+                        error = (
+                            f"Timed out waiting for action batch {batch['id']}, "
+                            "changes may still be applied"
+                        )
+                        return [errorRow(error, *update) for update in updates]
+                    await asyncio.sleep(ACTION_BATCH_POLL_SECONDS)
+                    batch = await organizations.getOrganizationActionBatch(
+                        org_id, batch["id"]
+                    )
+            except AsyncAPIError:
+                pass
+            else:
+                if not batch["status"]["failed"]:
+                    return []
+        # Action batches are atomic, so one bad update rolls back the whole
+        # batch. Re-run each update on its own to find the ones that fail
+        results = await asyncio.gather(*(updateOne(*update) for update in updates))
+        return [error for error in results if error]
+
+    print("Beginning update process...")
+    errors = []
+    updates = [
+        (network_id, ssid_id, {"enabled": True, "rules": rules})
+        for network_id in data
+        for ssid_id, rules in data[network_id].items()
+    ]
+    tasks = [
+        runBatch(updates[i : i + ACTION_BATCH_SIZE])
+        for i in range(0, len(updates), ACTION_BATCH_SIZE)
+    ]
+    for task in track(asyncio.as_completed(tasks), total=len(tasks)):
+        errors.extend(await task)
     return errors
 
 
@@ -251,17 +617,29 @@ def showUpdateErrors(errors: list, ssids: dict) -> None:
     """
     table = Table("Error", "Network Name", "SSID Name", "Update Payload", expand=True, show_lines=True)
     for error in errors:
-        for network in ssids:
-            if ssids[network]["id"] == error["network"]:
-                network_name = network
-            for ssid in ssids[network]["ssids"]:
-                if ssids[network]["ssids"][ssid] == error["ssid"]:
-                    ssid_name = ssid
+        network_name = ssids["net_name_by_id"][error["network"]]
+        ssid_name = ssids["ssid_name_by_num_by_netid"][error["network"]][error["ssid"]]
         table.add_row(error["error"], network_name, ssid_name, str(error["payload"]))
     print(table)
 
 
-def main():
+def parseArgs() -> argparse.Namespace:
+    """
+    Parse command line arguments
+    """
+    parser = argparse.ArgumentParser(
+        description="Bulk update Meraki SSID bonjour settings from a CSV file"
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore cached network / SSID data and re-fetch from Meraki",
+    )
+    return parser.parse_args()
+
+
+async def main():
+    args = parseArgs()
     print()
     print(Panel.fit("  -- Start --  "))
     print()
@@ -270,28 +648,36 @@ def main():
     print(Panel.fit("Connect to Meraki", title="Step 1"))
     if API_KEY:
         print("Found API key as environment variable")
-        dashboard = meraki.DashboardAPI(suppress_logging=True)
+        key = API_KEY
     else:
         key = Prompt.ask("Enter Meraki Dashboard API Key")
-        dashboard = meraki.DashboardAPI(key, suppress_logging=True)
+    dashboard = meraki.DashboardAPI(key, **DASHBOARD_OPTIONS)
+    configureSession(dashboard)
     org_id = getOrgs(dashboard)
 
-    print()
-    print(Panel.fit("Collect Deployment Info", title="Step 2"))
-    networks = getNetworks(dashboard, org_id)
-    ssids = getNetworkSSID(dashboard, networks)
+    # Fan-out phases share a single async client / rate limiter
+    async with meraki.aio.AsyncDashboardAPI(
+        key, maximum_concurrent_requests=MAX_WORKERS, **DASHBOARD_OPTIONS
+    ) as aio_dashboard:
+        configureAsyncSession(aio_dashboard)
+        print()
+        print(Panel.fit("Collect Deployment Info", title="Step 2"))
+        networks = getNetworks(dashboard, org_id, refresh=args.refresh)
+        ssids = indexSSIDs(
+            await getNetworkSSID(aio_dashboard, org_id, networks, refresh=args.refresh)
+        )
 
-    print()
-    print(Panel.fit("CSV Input", title="Step 3"))
-    csv = openCSV()
-    good_entries = processCSV(csv, ssids)
+        print()
+        print(Panel.fit("CSV Input", title="Step 3"))
+        csv = openCSV()
+        good_entries = processCSV(csv, ssids)
 
-    print()
-    print(Panel.fit("Update Bonjour Settings", title="Step 4"))
-    if not Confirm.ask("Proceed with updating bonjour settings?"):
-        print("[red]Quitting. Please re-run script when ready.")
-        sys.exit(1)
-    errors = updateBonjour(dashboard, good_entries)
+        print()
+        print(Panel.fit("Update Bonjour Settings", title="Step 4"))
+        if not Confirm.ask("Proceed with updating bonjour settings?"):
+            print("[red]Quitting. Please re-run script when ready.")
+            sys.exit(1)
+        errors = await updateBonjour(aio_dashboard, org_id, good_entries)
     if len(errors) == 0:
         print("[green]All changes processed successfully.")
     else:
@@ -306,6 +692,6 @@ def main():
 
 if __name__ == "__main__":
     try:
-        main()
+        asyncio.run(main())
     except KeyboardInterrupt:
         print("\r\n[red]Quitting...")